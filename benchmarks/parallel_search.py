@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from board.board import Board
+from bots.minimax import MiniMaxBot
+
+
+def random_positions(count, plies, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board(Board.PLAYER1_PIECE)
+        for _ in range(plies):
+            board.drop_piece(rng.choice(board.get_valid_locations()), board.CURR_PLAYER)
+            if board.winner is not None:
+                break
+        if board.winner is None:
+            positions.append(board)
+    return positions
+
+
+def time_search(positions, depth, workers):
+    """Returns (seconds, moves) for searching every position with a fresh bot."""
+    moves = []
+    elapsed = 0.0
+    bots = {}
+    for board in positions:
+        piece = board.CURR_PLAYER
+        if piece not in bots:
+            bots[piece] = MiniMaxBot(piece, depth=depth, workers=workers)
+        bot = bots[piece]
+        if bot.parallel is not None:
+            bot.parallel.start()
+        else:
+            bot.search.transposition_table.clear()
+        start = time.perf_counter()
+        moves.append(bot.get_move(board))
+        elapsed += time.perf_counter() - start
+    for bot in bots.values():
+        bot.close_pool()
+    return elapsed, moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wall-clock speedup of the parallel root search vs. worker count.')
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--positions', type=int, default=10)
+    parser.add_argument('--plies', type=int, default=6, help='random plies played to reach each position')
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help='worker counts to try (default: powers of two up to the core count)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    workers = args.workers
+    if workers is None:
+        workers = [1]
+        while workers[-1] * 2 <= (os.cpu_count() or 1):
+            workers.append(workers[-1] * 2)
+
+    positions = random_positions(args.positions, args.plies, args.seed)
+    serial_time, serial_moves = time_search(positions, args.depth, 1)
+
+    print('cores: %d, depth: %d, positions: %d' % (os.cpu_count() or 1, args.depth, len(positions)))
+    print('%8s %10s %8s %10s' % ('workers', 'seconds', 'speedup', 'same move'))
+    print('%8d %10.2f %8.2f %10s' % (1, serial_time, 1.0, 'yes'))
+    for count in workers:
+        if count == 1:
+            continue
+        elapsed, moves = time_search(positions, args.depth, count)
+        same = 'yes' if moves == serial_moves else 'NO'
+        print('%8d %10.2f %8.2f %10s' % (count, elapsed, serial_time / elapsed, same))
+
+
+if __name__ == '__main__':
+    main()
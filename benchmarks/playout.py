@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from board.board import Board
+from board.bitboard import BitBoard
+from bots import playout
+
+
+def board_playout(board):
+    """The rollout MonteCarloBot used before bots.playout, on a Board or BitBoard."""
+    moves_played = 0
+    while board.get_valid_locations():
+        board.drop_piece(random.choice(board.get_valid_locations()), board.CURR_PLAYER)
+        moves_played += 1
+        if board.winner is not None:
+            break
+    result = board.search_result(board.PLAYER1_PIECE)
+    for _ in range(moves_played):
+        board.undo_move()
+    return result
+
+
+def kernel_playout(board):
+    current, mask = playout.position(board)
+    return playout.random_playout(current, mask)
+
+
+def playouts_per_second(rollout, board, seconds):
+    # calls per second, times the games per call for the lockstep playouts
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            rollout(board)
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Random playouts per second from the empty board.')
+    parser.add_argument('--seconds', type=float, default=2.0, help='time spent on each rollout kind')
+    parser.add_argument('--batch', type=int, nargs='+', default=[64, 1024], help='game counts for the lockstep numpy playouts')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    current, mask = playout.position(Board(Board.PLAYER1_PIECE))
+    # (name, rollout, board, games played per call)
+    rollouts = [
+        ('Board', board_playout, Board(Board.PLAYER1_PIECE), 1),
+        ('BitBoard', board_playout, BitBoard(Board.PLAYER1_PIECE), 1),
+        ('bots.playout', lambda board: playout.random_playout(current, mask), None, 1),
+        ('bots.playout + position', kernel_playout, Board(Board.PLAYER1_PIECE), 1),
+    ]
+    for count in args.batch:
+        rollouts.append(('random_playouts x%d' % count, lambda board, count=count: playout.random_playouts(current, mask, count), None, count))
+
+    print('%-24s %14s %8s' % ('rollout', 'playouts/s', 'speedup'))
+    baseline = None
+    for name, rollout, board, games in rollouts:
+        rate = playouts_per_second(rollout, board, args.seconds) * games
+        baseline = baseline or rate
+        print('%-24s %14.0f %8.2f' % (name, rate, rate / baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 from .board import Board
+from .bitboard import BitBoard
 from .graphics import GBoard
 
 __all__ = [
     'Board',
+    'BitBoard',
     'GBoard'
 ]
@@ -0,0 +1,105 @@
+import numpy as np
+import copy
+from .board import Board
+
+class BitBoard(Board):
+    # Each column takes HEIGHT bits: ROW_COUNT playable cells plus one
+    # always-empty sentinel bit so that shifted lines never wrap into the
+    # next column. Cell (row, col) lives at bit col * HEIGHT + row.
+    HEIGHT = Board.ROW_COUNT + 1
+
+    # Shift distances for the four line directions:
+    # vertical, horizontal, positive diagonal, negative diagonal.
+    DIRECTIONS = (1, HEIGHT, HEIGHT + 1, HEIGHT - 1)
+
+    def __init__(self, current_player):
+        self.masks = [0, 0, 0]
+        self.heights = [0] * self.COLUMN_COUNT
+        self.num_slots_filled = 0
+        self.move_stack = []
+        self.winner = None
+        self.listeners = []
+        self.hash = 0
+        self.mirror_hash = 0
+        self.CURR_PLAYER = current_player
+        self.PREV_PLAYER = self.get_opp_player(current_player)
+        self._grid = None
+
+    @classmethod
+    def from_board(cls, board):
+        b = cls(board.CURR_PLAYER)
+        grid = board.get_board()
+        for r in range(cls.ROW_COUNT):
+            for c in range(cls.COLUMN_COUNT):
+                piece = int(grid[r][c])
+                if piece != cls.EMPTY:
+                    b.masks[piece] |= 1 << (c * cls.HEIGHT + r)
+                    b.heights[c] = r + 1
+        b.num_slots_filled = board.num_slots_filled
+        b.PREV_MOVE = board.PREV_MOVE
+        b.PREV_PLAYER = board.PREV_PLAYER
+        b.winner = board.winner
+        b.hash = b.compute_hash()
+        b.mirror_hash = b.compute_hash(mirror=True)
+        return b
+
+    def copy_board(self):
+        c = copy.copy(self)
+        c.masks = list(self.masks)
+        c.heights = list(self.heights)
+        c.move_stack = list(self.move_stack)
+        c.listeners = []
+        return c
+
+    def get_board(self):
+        # materialised lazily for code that still wants the 2D array view
+        if self._grid is None:
+            grid = np.zeros((self.ROW_COUNT, self.COLUMN_COUNT), dtype=int)
+            for c in range(self.COLUMN_COUNT):
+                for r in range(self.heights[c]):
+                    grid[r][c] = self.get_row_col(r, c)
+            self._grid = grid
+        return self._grid
+
+    def get_row_col(self, row, col):
+        bit = 1 << (col * self.HEIGHT + row)
+        if self.masks[self.PLAYER1_PIECE] & bit:
+            return self.PLAYER1_PIECE
+        if self.masks[self.PLAYER2_PIECE] & bit:
+            return self.PLAYER2_PIECE
+        return self.EMPTY
+
+    def place_piece(self, row, col, piece):
+        self.masks[piece] |= 1 << (col * self.HEIGHT + row)
+        self.heights[col] = row + 1
+        self._grid = None
+
+    def remove_piece(self, row, col, piece):
+        self.masks[piece] &= ~(1 << (col * self.HEIGHT + row))
+        self.heights[col] = row
+        self._grid = None
+
+    def is_valid_location(self, col):
+        return self.heights[col] < self.ROW_COUNT
+
+    def get_next_open_row(self, col):
+        if self.heights[col] < self.ROW_COUNT:
+            return self.heights[col]
+
+    def print_board(self):
+        print(np.flip(self.get_board(), 0))
+
+    def winning_move(self, piece):
+        pos = self.masks[piece]
+        for shift in self.DIRECTIONS:
+            m = pos & (pos >> shift)
+            if m & (m >> (2 * shift)):
+                return True
+        return False
+
+    def connects_four(self, row, col, piece):
+        # a full shift-and-mask check is already as cheap as a local one
+        return self.winning_move(piece)
+
+    def get_valid_locations(self):
+        return [col for col in range(self.COLUMN_COUNT) if self.heights[col] < self.ROW_COUNT]
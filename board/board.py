@@ -1,5 +1,13 @@
 import numpy as np
 import copy
+import random
+
+# fixed seed so hashes are stable across processes and runs
+ZOBRIST_SEED = 7342
+
+def zobrist_keys(rows, cols):
+    rng = random.Random(ZOBRIST_SEED)
+    return [[[rng.getrandbits(64) for col in range(cols)] for row in range(rows)] for piece in range(3)]
 
 class Board:
     ROW_COUNT = 6
@@ -15,9 +23,19 @@ class Board:
     PREV_PLAYER = None
     CURR_PLAYER = None
 
+    # ZOBRIST_KEYS[piece][row][col], xor-ed into hash as pieces come and go
+    ZOBRIST_KEYS = zobrist_keys(ROW_COUNT, COLUMN_COUNT)
+    # the key of the mirrored cell, xor-ed into mirror_hash
+    MIRROR_KEYS = [[keys[::-1] for keys in piece_keys] for piece_keys in ZOBRIST_KEYS]
+
     def __init__(self, current_player):
         self.board = np.zeros((self.ROW_COUNT, self.COLUMN_COUNT), dtype=int)
         self.num_slots_filled = 0
+        self.move_stack = []
+        self.winner = None
+        self.listeners = []
+        self.hash = 0
+        self.mirror_hash = 0
         self.CURR_PLAYER = current_player
         self.PREV_PLAYER = self.get_opp_player(current_player)
 
@@ -25,9 +43,36 @@ class Board:
         return self.num_slots_filled
 
     def copy_board(self):
+        # listeners follow the board they were attached to, not its copies
+        listeners, self.listeners = self.listeners, []
         c = copy.deepcopy(self)
+        self.listeners = listeners
         return c
 
+    def compute_hash(self, mirror=False):
+        keys = self.MIRROR_KEYS if mirror else self.ZOBRIST_KEYS
+        h = 0
+        for r in range(self.ROW_COUNT):
+            for c in range(self.COLUMN_COUNT):
+                piece = self.get_row_col(r, c)
+                if piece != self.EMPTY:
+                    h ^= keys[piece][r][c]
+        return h
+
+    def canonical_key(self):
+        """
+        Returns (key, mirrored): the same key for a position and its
+        left-right mirror image, and whether the key is the mirror's hash.
+        Moves stored under the key are in the canonical orientation, so pass
+        them through mirror_column when mirrored is True
+        """
+        if self.mirror_hash < self.hash:
+            return self.mirror_hash, True
+        return self.hash, False
+
+    def mirror_column(self, col):
+        return self.COLUMN_COUNT - 1 - col
+
     def get_board(self):
         return self.board
 
@@ -42,11 +87,34 @@ class Board:
 
     def drop_piece(self, col, piece):
         row = self.get_next_open_row(col)
-        self.board[row][col] = piece
+        self.place_piece(row, col, piece)
+        self.move_stack.append((row, col, piece, self.PREV_MOVE, self.PREV_PLAYER, self.CURR_PLAYER, self.winner))
+        if self.winner is None and self.connects_four(row, col, piece):
+            self.winner = piece
+        self.hash ^= self.ZOBRIST_KEYS[piece][row][col]
+        self.mirror_hash ^= self.MIRROR_KEYS[piece][row][col]
         self.num_slots_filled += 1
         self.PREV_MOVE = col
         self.PREV_PLAYER = piece
         self.CURR_PLAYER = self.get_opp_player(piece)
+        for listener in self.listeners:
+            listener.piece_dropped(row, col, piece)
+
+    def undo_move(self):
+        # reverses the latest drop_piece, restoring the turn bookkeeping
+        row, col, piece, self.PREV_MOVE, self.PREV_PLAYER, self.CURR_PLAYER, self.winner = self.move_stack.pop()
+        self.remove_piece(row, col, piece)
+        self.hash ^= self.ZOBRIST_KEYS[piece][row][col]
+        self.mirror_hash ^= self.MIRROR_KEYS[piece][row][col]
+        self.num_slots_filled -= 1
+        for listener in self.listeners:
+            listener.piece_removed(row, col, piece)
+
+    def place_piece(self, row, col, piece):
+        self.board[row][col] = piece
+
+    def remove_piece(self, row, col, piece):
+        self.board[row][col] = self.EMPTY
 
     def is_valid_location(self, col):
         return self.board[self.ROW_COUNT-1][col] == 0
@@ -84,6 +152,19 @@ class Board:
                 if self.board[r][c] == piece and self.board[r-1][c+1] == piece and self.board[r-2][c+2] == piece and self.board[r-3][c+3] == piece:
                     return True
 
+    def connects_four(self, row, col, piece):
+        # only lines through the newly dropped piece can have been completed
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign*dr, col + sign*dc
+                while 0 <= r < self.ROW_COUNT and 0 <= c < self.COLUMN_COUNT and self.board[r][c] == piece:
+                    count += 1
+                    r, c = r + sign*dr, c + sign*dc
+            if count >= self.WINDOW_LENGTH:
+                return True
+        return False
+
     def get_valid_locations(self):
         valid_locations = []
         for col in range(self.COLUMN_COUNT):
@@ -97,9 +178,9 @@ class Board:
         return False
 
     def search_result(self, piece):
-        if self.winning_move(piece):
+        if self.winner == piece:
             return 1
-        elif self.winning_move(self.get_opp_player(piece)):
+        elif self.winner is not None:
             return 0
         elif not self.get_valid_locations():
             return 0.5
@@ -1,3 +1,41 @@
+import numpy as np
+from board.board import Board
+
+# every four-cell window scored by score_position, as lists of (row, col)
+WINDOWS = []
+for r in range(Board.ROW_COUNT):
+	for c in range(Board.COLUMN_COUNT-3):
+		WINDOWS.append([(r, c+i) for i in range(Board.WINDOW_LENGTH)])
+for c in range(Board.COLUMN_COUNT):
+	for r in range(Board.ROW_COUNT-3):
+		WINDOWS.append([(r+i, c) for i in range(Board.WINDOW_LENGTH)])
+for r in range(Board.ROW_COUNT-3):
+	for c in range(Board.COLUMN_COUNT-3):
+		WINDOWS.append([(r+i, c+i) for i in range(Board.WINDOW_LENGTH)])
+		WINDOWS.append([(r+3-i, c+i) for i in range(Board.WINDOW_LENGTH)])
+
+# the same windows as flat indices into board.get_board().ravel(), shape (69, 4)
+WINDOW_INDEX = np.array([[r*Board.COLUMN_COUNT + c for r, c in window] for window in WINDOWS])
+
+# a window is encoded in base 3 with one digit per cell (EMPTY=0, PLAYER1=1, PLAYER2=2)
+WINDOW_POWERS = 3 ** np.arange(Board.WINDOW_LENGTH)
+WINDOW_CODES = 3 ** Board.WINDOW_LENGTH
+
+# (window, digit power) pairs for the windows passing through each cell
+CELL_WINDOWS = [[[] for c in range(Board.COLUMN_COUNT)] for r in range(Board.ROW_COUNT)]
+for w, window in enumerate(WINDOWS):
+	for i, (r, c) in enumerate(window):
+		CELL_WINDOWS[r][c].append((w, int(WINDOW_POWERS[i])))
+
+CENTER_WEIGHT = 3
+
+def decode_window(code):
+	window = []
+	for _ in range(Board.WINDOW_LENGTH):
+		window.append(code % 3)
+		code //= 3
+	return window
+
 class Evaluation:
 	def __init__(self, piece):
 		self.bot_piece = piece
@@ -5,6 +43,21 @@ class Evaluation:
 			self.opp_piece = 2
 		else:
 			self.opp_piece = 1
+		self.tracker = None
+		self.window_table = self.build_window_table()
+
+	def build_window_table(self):
+		# evaluate_window for every possible window contents, indexed by its base-3 code
+		return np.array([self.evaluate_window(Board, decode_window(code)) for code in range(WINDOW_CODES)])
+
+	def start_tracking(self, board):
+		# keep score_position(board) up to date incrementally while searching on board
+		self.tracker = IncrementalEvaluation(self, board)
+		board.listeners.append(self.tracker)
+
+	def stop_tracking(self, board):
+		board.listeners.remove(self.tracker)
+		self.tracker = None
 
 	def evaluate_window(self, board, window):
 		score = 0
@@ -21,40 +74,58 @@ class Evaluation:
 		return score
 
 	def score_position(self, board):
-		score = 0
+		if self.tracker is not None and self.tracker.board is board:
+			return self.tracker.score
+
+		grid = board.get_board()
 
 		## Score center column
-		center_array = [int(i) for i in list(board.get_board()[:, board.COLUMN_COUNT//2])]
-		center_count = center_array.count(self.bot_piece)
-		score += center_count * 3
-
-		## Score Horizontal
-		for r in range(board.ROW_COUNT):
-			row_array = [int(i) for i in list(board.get_board()[r,:])]
-			for c in range(board.COLUMN_COUNT-3):
-				window = row_array[c:c+board.WINDOW_LENGTH]
-				score += self.evaluate_window(board, window)
-
-		## Score Vertical
-		for c in range(board.COLUMN_COUNT):
-			col_array = [int(i) for i in list(board.get_board()[:,c])]
-			for r in range(board.ROW_COUNT-3):
-				window = col_array[r:r+board.WINDOW_LENGTH]
-				score += self.evaluate_window(board, window)
-
-		## Score positive sloped diagonal
-		for r in range(board.ROW_COUNT-3):
-			for c in range(board.COLUMN_COUNT-3):
-				window = [board.get_board()[r+i][c+i] for i in range(board.WINDOW_LENGTH)]
-				score += self.evaluate_window(board, window)
-
-		## Score negative sloped diagonal
-		for r in range(board.ROW_COUNT-3):
-			for c in range(board.COLUMN_COUNT-3):
-				window = [board.get_board()[r+3-i][c+i] for i in range(board.WINDOW_LENGTH)]
-				score += self.evaluate_window(board, window)
+		center_count = int(np.count_nonzero(grid[:, board.COLUMN_COUNT//2] == self.bot_piece))
 
-		return score
+		## Score horizontal, vertical and both diagonal windows in one gather
+		codes = grid.ravel()[WINDOW_INDEX] @ WINDOW_POWERS
+		return int(self.window_table[codes].sum()) + center_count * CENTER_WEIGHT
+
+	def score_positions(self, boards):
+		# score_position for a stack of N board arrays (N x ROW_COUNT x COLUMN_COUNT) in one pass
+		boards = np.asarray(boards)
+		codes = boards.reshape(len(boards), -1)[:, WINDOW_INDEX] @ WINDOW_POWERS
+		center_counts = np.count_nonzero(boards[:, :, Board.COLUMN_COUNT//2] == self.bot_piece, axis=1)
+		return self.window_table[codes].sum(axis=1) + center_counts * CENTER_WEIGHT
 
 	def is_terminal_node(self, board):
-		return board.winning_move(self.bot_piece) or board.winning_move(self.opp_piece) or len(board.get_valid_locations()) == 0
+		return board.winner is not None or board.check_draw()
+
+
+class IncrementalEvaluation:
+	"""
+	Running score_position total for one board, kept up to date as a board listener.
+	Each window is tracked by its base-3 code, so a drop or undo only rescores
+	the windows through that cell with a lookup in the evaluator's window_table.
+	"""
+	def __init__(self, evaluation, board):
+		self.board = board
+		self.bot_piece = evaluation.bot_piece
+		self.window_scores = evaluation.window_table.tolist()
+
+		grid = board.get_board()
+		self.codes = (grid.ravel()[WINDOW_INDEX] @ WINDOW_POWERS).tolist()
+		self.score = evaluation.score_position(board)
+
+	def piece_dropped(self, row, col, piece):
+		self.update(row, col, piece, piece)
+
+	def piece_removed(self, row, col, piece):
+		self.update(row, col, piece, -piece)
+
+	def update(self, row, col, piece, digit):
+		codes = self.codes
+		window_scores = self.window_scores
+		score = self.score
+		for w, power in CELL_WINDOWS[row][col]:
+			code = codes[w]
+			codes[w] = code + digit * power
+			score += window_scores[codes[w]] - window_scores[code]
+		if piece == self.bot_piece and col == self.board.COLUMN_COUNT//2:
+			score += CENTER_WEIGHT if digit > 0 else -CENTER_WEIGHT
+		self.score = score
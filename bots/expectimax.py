@@ -1,60 +1,18 @@
-import random
-import math
 from bots.evaluation import Evaluation
+from bots.search import NegamaxSearch
 
 class ExpectiMaxBot(Evaluation):
-	def __init__(self, piece, depth=5):
+	def __init__(self, piece, depth=5, move_ordering=None):
 		super().__init__(piece)
 		self.depth = depth
+		# exact averages rarely fail a null window, so PVS re-searches would cost more than they save
+		self.search = NegamaxSearch(self, move_ordering=move_ordering,
+			principal_variation=False, chance_policy=self.expected_value)
 
-	def expectimax(self, board, depth, alpha, beta, maximizingPlayer):
-		valid_locations = board.get_valid_locations()
-		is_terminal = super().is_terminal_node(board)
+	def expected_value(self, scores):
+		# the opponent is modelled as playing each of its moves with equal probability
+		return sum(scores) / len(scores)
 
-		if depth == 0 or is_terminal:
-			if is_terminal:
-				if board.winning_move(self.bot_piece):
-					return (None, 100000000000000)
-				elif board.winning_move(self.opp_piece):
-					return (None, -10000000000000)
-				else: # Game is over, no more valid moves
-					return (None, 0)
-			else: # Depth is zero
-				return (None, super().score_position(board))
-
-		if maximizingPlayer:
-			value = -math.inf
-			column = random.choice(valid_locations)
-			for col in valid_locations:
-				b_copy = board.copy_board()
-				b_copy.drop_piece(col, self.bot_piece)
-				new_score = self.expectimax(b_copy, depth-1, alpha, beta, False)[1]
-
-				if new_score > value:
-					value = new_score
-					column = col
-
-				alpha = max(alpha, value)
-				if alpha >= beta:
-					break
-			return column, value
-		else: # Expecting player
-			value = 0
-			column = random.choice(valid_locations)
-			for col in valid_locations:
-				b_copy = board.copy_board()
-				b_copy.drop_piece(col, self.opp_piece)
-				new_score = self.expectimax(b_copy, depth-1, alpha, beta, True)[1]
-
-				if new_score <= value:
-					value = new_score
-					column = col
-
-				beta = math.floor(value/len(valid_locations))
-				if alpha >= beta:
-					break
-			return column, value
-
-	def get_move(self, board):
-		col, expectimax_score = self.expectimax(board, self.depth, -math.inf, 0, True)
-		return col
+	def get_move(self, board, deadline=None):
+		# with a deadline (a time.perf_counter() value) the search deepens until it instead of using depth
+		return self.search.get_move(board, self.depth, self.search.time_left(deadline))
@@ -1,6 +1,9 @@
 import random
 import math
+import time
+import numpy as np
 from bots.evaluation import Evaluation
+from bots.parallel_fitness import ParallelFitness
 
 class GeneticAlgorithmBot(Evaluation) :
     """
@@ -25,7 +28,9 @@ class GeneticAlgorithmBot(Evaluation) :
                  population_size=20, 
                  generations=50, 
                  mutation_rate=0.1,
-                 sequence_length=6):
+                 sequence_length=6,
+                 workers=1,
+                 warm_start=True):
         """
         Args:
             piece: The player's piece (1 or 2)
@@ -33,6 +38,8 @@ class GeneticAlgorithmBot(Evaluation) :
             generations: Number of loop
             mutation_rate: Probability of gene mutation
             sequence_length: Number of moves to look ahead
+            workers: Processes evaluating the population, the pool lasts until close_pool
+            warm_start: Start each move from the population evolved for the previous one
         """
         super().__init__(piece)
         self.piece = piece
@@ -41,24 +48,72 @@ class GeneticAlgorithmBot(Evaluation) :
         self.mutation_rate = mutation_rate
         self.sequence_length = sequence_length
         self.opponent_piece = 2 if piece == 1 else 1
+        self.warm_start = warm_start
+        # the last population evolved, the move it chose and the board hash right after that move
+        self.population = None
+        self.last_move = None
+        self.last_hash = None
+        self.clear_cache()
+        self.parallel = None
+        if workers > 1:
+            self.parallel = ParallelFitness(type(self), piece, workers, sequence_length=sequence_length)
     
-    def get_move(self, board):
+    def get_move(self, board, deadline=None):
         """
         Main GA Loop
+        With a deadline (a time.perf_counter() value) generations are evolved
+        until it instead of self.generations, at least one
         """
-        # Initialize random population of move sequences
-        population = self.initialize_population(board)
+        self.clear_cache()
+        if self.parallel is not None:
+            self.parallel.new_search()
+
+        # Initialize population of move sequences, carried over from the last move if possible
+        if self.warm_start:
+            population = self.warm_start_population(board)
+        else:
+            population = self.initialize_population(board)
         
         # Evolve population over generations
-        for generation in range(self.generations):
+        generation = 0
+        while self.keep_evolving(generation, deadline):
             fitness_scores = self.evaluate_population(board, population)
             population = self.select_and_breed(population, fitness_scores)
             self.mutate_population(population)
+            generation += 1
         
         # Return first move of the best sequence
         best_move = self.get_best_move(board, population)
+        self.population = population
+        self.last_move = best_move
+        self.last_hash = board.hash ^ board.ZOBRIST_KEYS[self.piece][board.get_next_open_row(best_move)][best_move]
         return best_move
         
+    def keep_evolving(self, generation, deadline):
+        if deadline is None:
+            return generation < self.generations
+        return generation == 0 or time.perf_counter() < deadline
+
+    def warm_start_population(self, board):
+        """
+        Carry the previous population over when the board is the one it was
+        evolved for plus our move and one opponent reply
+        Individuals that started with the move played are shifted by it and
+        get a random last move, the rest are refilled randomly
+        """
+        population = self.initialize_population(board)
+        if self.population is None or not board.move_stack:
+            return population
+        row, col, piece = board.move_stack[-1][:3]
+        if board.hash ^ board.ZOBRIST_KEYS[piece][row][col] != self.last_hash:
+            return population
+
+        valid_moves = board.get_valid_locations()
+        carried = [individual[1:] + [random.choice(valid_moves)]
+                   for individual in self.population if individual[0] == self.last_move]
+        carried = carried[:self.population_size]
+        return carried + population[len(carried):]
+
     def initialize_population(self, board):
         """
         Create initial population of random move sequences
@@ -76,40 +131,138 @@ class GeneticAlgorithmBot(Evaluation) :
     def evaluate_population(self, board, population):
         """
         Calculate fitness score for each individual in population
+        Same result as calculate_fitness on every individual. Board states
+        are memoised per move prefix (each move followed by the opponent's
+        best reply) and fitness per whole sequence, both until the next
+        get_move, so shared prefixes are played once. The prefixes missing
+        from the cache are advanced together one ply at a time on stacked
+        board arrays, scoring all their opponent replies in one
+        score_positions call
         """
-        fitness_scores = []
-        for individual in population:
-            score = self.calculate_fitness(board, individual)
-            fitness_scores.append(score)
-        return fitness_scores
+        keys = [tuple(individual) for individual in population]
+        fitness_scores = [self.fitness_cache.get(key) for key in keys]
+        pending = {key for key, score in zip(keys, fitness_scores) if score is None}
+        self.cache_hits['fitness'] += len(keys) - len(pending)
+        self.cache_misses['fitness'] += len(pending)
+        if self.parallel is not None:
+            if pending:
+                scores, hits, misses = self.parallel.evaluate(board, list(pending))
+                self.fitness_cache.update(scores)
+                # the prefixes are looked up in the workers' caches
+                self.cache_hits['prefix'] += hits
+                self.cache_misses['prefix'] += misses
+            return [self.fitness_cache[key] for key in keys]
+
+        if () not in self.prefix_cache:
+            self.prefix_cache[()] = board.get_board().copy()
+        for step in range(self.sequence_length):
+            prefixes = {key[:step+1] for key in pending}
+            missing = [prefix for prefix in prefixes if prefix not in self.prefix_cache]
+            self.cache_hits['prefix'] += len(prefixes) - len(missing)
+            self.cache_misses['prefix'] += len(missing)
+            if missing:
+                grids = np.array([self.prefix_cache[prefix[:-1]] for prefix in missing])
+                grids, valid = self.play_step(board, grids, np.array([prefix[-1] for prefix in missing]))
+                for prefix, grid, ok in zip(missing, grids, valid):
+                    self.prefix_cache[prefix] = grid if ok else None
+
+            # Invalid move penalization
+            for key in [key for key in pending if self.prefix_cache[key[:step+1]] is None]:
+                self.fitness_cache[key] = -1000
+                pending.remove(key)
+
+        if pending:
+            pending = list(pending)
+            scores = self.score_positions(np.array([self.prefix_cache[key] for key in pending]))
+            for key, score in zip(pending, scores.tolist()):
+                self.fitness_cache[key] = score
+        return [self.fitness_cache[key] for key in keys]
+
+    def play_step(self, board, grids, moves):
+        """
+        Plays moves[i] on grids[i] followed by the opponent's best reply
+        Returns the new grids and whether each move was valid
+        """
+        rows, cols = board.ROW_COUNT, board.COLUMN_COUNT
+        grids = grids.copy()
+        heights = np.count_nonzero(grids != board.EMPTY, axis=1)
+        valid = (moves >= 0) & (moves < cols)
+        valid[valid] = heights[valid, moves[valid]] < rows
+        alive, moves, heights = np.nonzero(valid)[0], moves[valid], heights[valid]
+        if len(alive) == 0:
+            return grids, valid
+
+        grids[alive, heights[np.arange(len(alive)), moves], moves] = self.piece
+        heights[np.arange(len(alive)), moves] += 1
+
+        # Opponent's turn - assume opponent plays optimally
+        open_cols = heights < rows
+        replies = np.repeat(grids[alive][:, np.newaxis], cols, axis=1)
+        a, c = np.nonzero(open_cols)
+        replies[a, c, heights[a, c], c] = self.opponent_piece
+        scores = self.score_positions(replies.reshape(-1, rows, cols)).reshape(len(alive), cols)
+        scores = np.where(open_cols, scores, -math.inf)
+
+        has_reply = open_cols.any(axis=1)
+        replying = alive[has_reply]
+        best_opp_moves = scores[has_reply].argmax(axis=1)
+        grids[replying, heights[has_reply, best_opp_moves], best_opp_moves] = self.opponent_piece
+        return grids, valid
+
+    def close_pool(self):
+        if self.parallel is not None:
+            self.parallel.close()
+
+    def clear_cache(self):
+        self.prefix_cache = {}
+        self.fitness_cache = {}
+        self.cache_hits = {'prefix': 0, 'fitness': 0}
+        self.cache_misses = {'prefix': 0, 'fitness': 0}
+
+    def cache_stats(self):
+        # lookups and hit rates of both caches during the latest get_move
+        stats = {}
+        for name in self.cache_hits:
+            lookups = self.cache_hits[name] + self.cache_misses[name]
+            stats[name] = {'hits': self.cache_hits[name], 'misses': self.cache_misses[name],
+                           'hit_rate': self.cache_hits[name] / lookups if lookups else 0.0}
+        return stats
     
     def calculate_fitness(self, board, individual):
         """
         Fitness function that evaluates a sequence of moves
+        Moves are played on the board in place and undone before returning
         """
-        temp_board = board.copy_board()
+        moves_played = 0
         for move in individual:
-            if temp_board.is_valid_location(move):
-                temp_board.drop_piece(move, self.piece)
+            if board.is_valid_location(move):
+                board.drop_piece(move, self.piece)
+                moves_played += 1
                 
                 # Opponent's turn - assume opponent plays optimally
-                opponent_moves = temp_board.get_valid_locations()
+                opponent_moves = board.get_valid_locations()
                 if opponent_moves:
                     best_opp_move = None
                     best_opp_score = -math.inf
                     for opp_move in opponent_moves:
-                        test_board = temp_board.copy_board()
-                        test_board.drop_piece(opp_move, self.opponent_piece)
-                        score = self.score_position(test_board)
+                        board.drop_piece(opp_move, self.opponent_piece)
+                        score = self.score_position(board)
+                        board.undo_move()
                         if score > best_opp_score:
                             best_opp_score = score
                             best_opp_move = opp_move
                     if best_opp_move is not None:
-                        temp_board.drop_piece(best_opp_move, self.opponent_piece)
+                        board.drop_piece(best_opp_move, self.opponent_piece)
+                        moves_played += 1
             else:
                 # Invalid move penalization
-                return -1000
-        score = self.score_position(temp_board)
+                score = -1000
+                break
+        else:
+            score = self.score_position(board)
+
+        for _ in range(moves_played):
+            board.undo_move()
         return score
     
     def has_m1_state(self, board, piece):
@@ -8,7 +8,7 @@ class Human:
         self.piece = piece
         self.colour = colour
 
-    def get_move(self, board):
+    def get_move(self, board, deadline=None):
         gb = GBoard(board)
         gb.draw_gboard(board)
 
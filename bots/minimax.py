@@ -1,60 +1,72 @@
-import random
-import math
 from bots.evaluation import Evaluation
+from bots.transposition import TranspositionTable
+from bots.search import NegamaxSearch
+from bots.parallel_search import ParallelRootSearch
+from bots.opening_book import OpeningBook
+from bots.solver import EndgameSolver
+from bots.pondering import Ponderer
 
 class MiniMaxBot(Evaluation):
-	def __init__(self, piece, depth=5):
+	def __init__(self, piece, depth=5, tt_size=TranspositionTable.DEFAULT_SIZE, tt_replacement='depth', move_ordering=None, time_limit=None, workers=1, book=None, endgame_threshold=EndgameSolver.DEFAULT_THRESHOLD, ponder=False):
 		super().__init__(piece)
 		self.depth = depth
+		# with a time_limit (seconds), get_move deepens iteratively instead of using depth
+		self.time_limit = time_limit
+		transposition_table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+		self.search = NegamaxSearch(self, transposition_table, move_ordering)
+		# path to an opening book built with bots.opening_book, probed before searching
+		self.book = OpeningBook(book) if book is not None else None
+		# positions with at most endgame_threshold empty cells are solved exactly
+		self.solver = EndgameSolver(endgame_threshold) if endgame_threshold else None
 
-	def minimax(self, board, depth, alpha, beta, maximizingPlayer):
-		valid_locations = board.get_valid_locations()
-		is_terminal = super().is_terminal_node(board)
+		# with ponder, the position after each move is searched in the background until the next get_move
+		self.ponderer = Ponderer() if ponder else None
 
-		if depth == 0 or is_terminal:
-			if is_terminal:
-				if board.winning_move(self.bot_piece):
-					return (None, 100000000000000)
-				elif board.winning_move(self.opp_piece):
-					return (None, -10000000000000)
-				else: # Game is over, no more valid moves
-					return (None, 0)
-			else: # Depth is zero
-				return (None, super().score_position(board))
+		# with several workers the root moves are searched in a process pool
+		self.parallel = None
+		if workers > 1:
+			if time_limit is not None:
+				raise ValueError("time_limit is not supported with workers > 1")
+			if ponder:
+				raise ValueError("ponder is not supported with workers > 1")
+			# every worker gets its own copy of move_ordering, so its heuristics match the serial search
+			self.parallel = ParallelRootSearch(type(self), piece, workers,
+				depth=depth, tt_size=tt_size, tt_replacement=tt_replacement, move_ordering=move_ordering)
 
-		if maximizingPlayer:
-			value = -math.inf
-			column = random.choice(valid_locations)
-			for col in valid_locations:
-				b_copy = board.copy_board()
-				b_copy.drop_piece(col, self.bot_piece)
-				new_score = self.minimax(b_copy, depth-1, alpha, beta, False)[1]
-
-				if new_score > value:
-					value = new_score
-					column = col
-
-				alpha = max(alpha, value)
-				if alpha >= beta:
-					break
-			return column, value
-		else: # Minimizing player
-			value = math.inf
-			column = random.choice(valid_locations)
-			for col in valid_locations:
-				b_copy = board.copy_board()
-				b_copy.drop_piece(col, self.opp_piece)
-				new_score = self.minimax(b_copy, depth-1, alpha, beta, True)[1]
+	def get_move(self, board, deadline=None):
+		# with a deadline (a time.perf_counter() value) the search deepens until it, replacing depth and time_limit
+		self.stop_pondering()
+		col = self.choose_move(board, deadline)
+		if self.ponderer is not None and col is not None:
+			position = board.copy_board()
+			position.drop_piece(col, position.CURR_PLAYER)
+			if position.winner is None and not position.check_draw():
+				self.ponderer.start(lambda stop: self.search.ponder(position, stop))
+		return col
 
-				if new_score < value:
-					value = new_score
-					column = col
+	def stop_pondering(self):
+		if self.ponderer is not None:
+			self.ponderer.stop(self.search.interrupt)
+			# the thread can finish between the liveness check and interrupt, which would leave
+			# the deadline in the past for the next search
+			self.search.deadline = None
 
-				beta = min(beta, value)
-				if alpha >= beta:
-					break
-			return column, value
+	def close_pool(self):
+		if self.parallel is not None:
+			self.parallel.close()
 
-	def get_move(self, board):
-		col, minimax_score = self.minimax(board, self.depth, -math.inf, math.inf, True)
-		return col
+	def choose_move(self, board, deadline=None):
+		if self.book is not None:
+			col = self.book.probe(board)
+			if col is not None:
+				return col
+		if self.solver is not None:
+			col = self.solver.get_move(board)
+			if col is not None:
+				return col
+		if deadline is not None:
+			# the process pool only searches to a fixed depth, so a deadline is always searched serially
+			return self.search.get_move(board, self.depth, self.search.time_left(deadline))
+		if self.parallel is not None:
+			return self.parallel.get_move(board, self.depth, self.search.move_ordering)
+		return self.search.get_move(board, self.depth, self.time_limit)
@@ -1,105 +1,325 @@
-import numpy as np
 import sys
-import copy
+import math
 import time
 import random
+import heapq
+from array import array
+from bots.opening_book import OpeningBook
+from bots.solver import EndgameSolver
+from bots import playout
+from bots.parallel_mcts import ParallelMCTS
+from bots.pondering import Ponderer
 
 class MonteCarloBot():
-    def __init__(self, piece, max_iterations = 20000 , timeout = 2):
+    def __init__(self, piece, max_iterations = 20000 , timeout = 2, book = None, endgame_threshold = EndgameSolver.DEFAULT_THRESHOLD, workers = 1, parallel = 'root', leaf_playouts = ParallelMCTS.DEFAULT_LEAF_PLAYOUTS, playouts = 1, max_nodes = None, verbose = False, ponder = False):
         self.piece = piece
         self.max_iterations = max_iterations
         self.timeout = timeout
-        self.currentNode = None
-
-    def montecarlo_tree_search(self, board, max_iterations, currentNode, timeout = 100):
-        rootnode = Node(piece=board.PREV_PLAYER, board=board)
-
-        if currentNode is not None:
-            rootnode = currentNode
+        # random playouts per expanded leaf, more than one are played in lockstep with numpy
+        self.playouts = playouts
+        # the search tree kept between moves, the id of the node for the current position and
+        # that position as a playout (current, mask) pair
+        self.tree = None
+        self.root = 0
+        self.position = None
+        # the tree is pruned to its most visited nodes when it would grow past max_nodes
+        self.max_nodes = max_nodes if max_nodes is not None else Tree.DEFAULT_MAX_NODES
+        # tree size, reused visits and bytes after the latest move, printed after every move when verbose
+        self.tree_stats = {}
+        self.verbose = verbose
+        # path to an opening book built with bots.opening_book, probed before searching
+        self.book = OpeningBook(book) if book is not None else None
+        # positions with at most endgame_threshold empty cells are solved exactly
+        self.solver = EndgameSolver(endgame_threshold) if endgame_threshold else None
+        # with several workers the iterations are spread over a process pool, see ParallelMCTS
+        self.parallel = None
+        if workers > 1:
+            self.parallel = ParallelMCTS(type(self), piece, workers, parallel, leaf_playouts)
+        # with ponder, the tree keeps growing in the background until the next get_move
+        self.ponderer = None
+        if ponder:
+            if self.parallel is not None and self.parallel.mode == 'root':
+                raise ValueError("ponder is not supported with root parallel search")
+            self.ponderer = Ponderer()
 
+    def montecarlo_tree_search(self, board, tree, max_iterations, timeout = 100, stop = None):
+        # searches from tree's root (node 0), which must be the position on board, on bitboards,
+        # until the iterations or the timeout run out or the stop event is set
+        root_current, root_mask = playout.position(board)
         start = time.perf_counter()
         for i in range(max_iterations):
-            node = rootnode
-            state = board.copy_board()
+            # a solved root needs no more iterations
+            if tree.proven[0] != Tree.UNPROVEN or (stop is not None and stop.is_set()):
+                break
+            if len(tree) + playout.WIDTH > self.max_nodes:
+                tree.compact(0, int(self.max_nodes * Tree.PRUNE_TO))
+
+            node = 0
+            current, mask = root_current, root_mask
 
             # selection
-            # keep going down the tree based on best UCT values until terminal or unexpanded node
-            while node.available_moves == [] and node.children != []:
-                node = node.selection()
-                state.drop_piece(node.move, state.CURR_PLAYER)
+            # keep going down the tree based on best UCT values of the unproven children until an unexpanded node
+            while tree.is_fully_expanded(node) and tree.child_count[node]:
+                node = tree.selection(node)
+                current, mask = playout.play(current, mask, tree.move[node])
 
             # expand
-            if node.available_moves != []:
-                col = random.choice(node.available_moves)
-                state.drop_piece(col, state.CURR_PLAYER)
-                node = node.expand(col, state)
-
-            # rollout
-            while state.get_valid_locations():
-                col = random.choice(state.get_valid_locations())
-                state.drop_piece(col, state.CURR_PLAYER)
-                if state.winning_move(state.PREV_PLAYER):
-                    break
+            lost = playout.is_lost(current, mask)
+            if tree.first_child[node] == -1:
+                moves = playout.valid_moves(mask) if not lost else []
+                tree.add_children(node, moves, board.get_opp_player(tree.piece[node]))
+            if not tree.is_fully_expanded(node):
+                node = tree.expand(node)
+                current, mask = playout.play(current, mask, tree.move[node])
+                lost = playout.is_lost(current, mask)
+
+            # rollout, result summed over count playouts for the player to move at node
+            if lost:
+                result, count = 0, 1
+                tree.proven[node] = Tree.WIN
+            elif not playout.valid_moves(mask):
+                result, count = 0.5, 1
+                tree.proven[node] = Tree.DRAW
+            elif self.parallel is not None and self.parallel.mode == 'leaf':
+                result, count = self.parallel.playouts(current, mask)
+            elif self.playouts > 1:
+                result, count = playout.random_playouts(current, mask, self.playouts).sum(), self.playouts
+            else:
+                result, count = playout.random_playout(current, mask), 1
 
             # backpropagate
-            while node is not None:
-                node.update(state.search_result(node.piece))
-                node = node.parent
+            tree.update(node, {tree.piece[node]: count - result, board.get_opp_player(tree.piece[node]): result}, count)
+            if tree.proven[node] != Tree.UNPROVEN:
+                tree.prove(node)
 
             duration = time.perf_counter() - start
             if duration > timeout:
                 break
 
-        win_ratio = lambda x: x.wins/x.visits
-        sorted_children = sorted(rootnode.children, key = win_ratio)[::-1]
+        return tree.best_move(0)
 
-        #for node in sorted_children:
-        #    print('Move: %s Win Rate: %.2f%%' % (node.move + 1, 100 * node.wins / node.visits))
-        #print('Simulations performed: %s\n' % i)
+    def root_statistics(self, board, max_iterations, timeout):
+        # (move, wins, visits) of the root children after searching board with a new tree
+        tree = Tree(board.PREV_PLAYER)
+        self.montecarlo_tree_search(board, tree, max_iterations, timeout)
+        return [(tree.move[child], tree.wins[child], tree.visits[child]) for child in tree.children(0)]
 
-        return rootnode, sorted_children[0].move
+    def advance(self, move, piece):
+        # moves the root to the child reached by move, or starts a new tree if it was never explored
+        child = self.tree.get_child(self.root, move)
+        if child is None:
+            self.tree, self.root = Tree(piece), 0
+        else:
+            self.root = child
 
-    def get_child_node(self, node, board, move, piece):
-        for child in node.children:
-            if child.move == move:
-                return child
-        return Node(piece = piece, board = board)
+    def get_move(self, board, deadline=None):
+        # with a deadline (a time.perf_counter() value) the search runs until it, replacing max_iterations and timeout
+        self.stop_pondering()
+        max_iterations, timeout = self.max_iterations, self.timeout
+        if deadline is not None:
+            max_iterations, timeout = sys.maxsize, max(0, deadline - time.perf_counter())
+        position = playout.position(board)
+        if self.tree is not None and board.PREV_MOVE is not None:
+            self.advance(board.PREV_MOVE, board.PREV_PLAYER)
+            self.position = playout.play(*self.position, board.PREV_MOVE)
+        # a new game, or moves the tree did not see
+        if self.tree is None or self.position != position:
+            self.tree, self.root = Tree(board.PREV_PLAYER), 0
+        self.position = position
 
-    def get_move(self, board):
-        if self.currentNode is None:
-            self.currentNode = Node(piece=self.piece, board=board)
-        
-        if board.PREV_MOVE is not None:
-            self.currentNode = self.get_child_node(self.currentNode, board, board.PREV_MOVE, board.CURR_PLAYER)
+        # keep only the subtree of the current position, freeing the siblings of the path played
+        if self.root != 0:
+            self.tree.compact(self.root, self.max_nodes)
+            self.root = 0
+        reused_visits = self.tree.visits[0]
 
-        self.currentNode, col = self.montecarlo_tree_search(board, self.max_iterations, self.currentNode, self.timeout)
-        self.currentNode = self.get_child_node(self.currentNode, board, col, board.PREV_PLAYER)
+        col = self.book.probe(board) if self.book is not None else None
+        if col is None and self.solver is not None:
+            col = self.solver.get_move(board)
+        if col is None and self.parallel is not None and self.parallel.mode == 'root':
+            col = self.parallel.get_move(board, max_iterations, timeout)
+        if col is None:
+            col = self.montecarlo_tree_search(board, self.tree, max_iterations, timeout)
+
+        self.tree_stats = {'nodes': len(self.tree), 'reused_visits': reused_visits, 'bytes': self.tree.nbytes()}
+        if self.verbose:
+            print('MCTS tree: %(nodes)d nodes, %(reused_visits)d reused visits, %(bytes)d bytes' % self.tree_stats)
+        self.advance(col, board.CURR_PLAYER)
+        self.position = playout.play(*position, col)
+        if self.ponderer is not None:
+            self.start_pondering(board, col)
         return col
 
-class Node:
-    def __init__(self, piece, board, parent=None, move=None):
-        self.board = board.copy_board()
-        self.parent = parent
-        self.move = move
-        self.available_moves = board.get_valid_locations()
-        self.children = []
-        self.wins = 0
-        self.visits = 0
-        self.piece = piece
+    def start_pondering(self, board, col):
+        # grows the tree of the position after col, which is what the next get_move reuses
+        if self.root != 0:
+            self.tree.compact(self.root, self.max_nodes)
+            self.root = 0
+        position = board.copy_board()
+        position.drop_piece(col, position.CURR_PLAYER)
+        if position.winner is None and not position.check_draw():
+            self.ponderer.start(lambda stop: self.montecarlo_tree_search(position, self.tree, sys.maxsize, math.inf, stop))
+
+    def stop_pondering(self):
+        if self.ponderer is not None:
+            self.ponderer.stop()
+
+    def close_pool(self):
+        if self.parallel is not None:
+            self.parallel.close()
+
+class Tree:
+    """
+    MCTS tree stored as parallel typed arrays indexed by node id
+
+    Node i was reached from parent[i] by piece[i] playing move[i]. Its
+    children are the ids first_child[i] .. first_child[i] + child_count[i] - 1,
+    one per valid move, allocated together the first time the node is
+    expanded (first_child[i] is -1 until then). The first tried[i] of them
+    have been played out and the rest are the untried moves. Nodes hold no
+    board: the search replays the moves from the root position instead.
+
+    proven[i] is the game-theoretic result of node i for piece[i] (LOSS,
+    DRAW or WIN) once it is known, and UNPROVEN before. Terminal positions
+    are proven when reached and proofs are passed up by prove, MCTS-Solver
+    style. Proven nodes are never selected again.
+    """
+    ARRAYS = ('parent', 'move', 'piece', 'wins', 'visits', 'first_child', 'child_count', 'tried', 'proven')
+
+    UNPROVEN = -1
+    LOSS = 0
+    DRAW = 1
+    WIN = 2
+
+    DEFAULT_MAX_NODES = 1 << 18
+    # pruning during a search keeps this fraction of max_nodes, so it does not run every iteration
+    PRUNE_TO = 0.75
 
-    def selection(self):
+    def __init__(self, piece):
+        self.parent = array('i', [-1])
+        self.move = array('b', [-1])
+        self.piece = array('b', [piece])
+        self.wins = array('d', [0])
+        self.visits = array('i', [0])
+        self.first_child = array('i', [-1])
+        self.child_count = array('b', [0])
+        self.tried = array('b', [0])
+        self.proven = array('b', [self.UNPROVEN])
+
+    def __len__(self):
+        return len(self.parent)
+
+    def append(self, parent, move, piece, wins=0, visits=0, proven=UNPROVEN):
+        self.parent.append(parent)
+        self.move.append(move)
+        self.piece.append(piece)
+        self.wins.append(wins)
+        self.visits.append(visits)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.tried.append(0)
+        self.proven.append(proven)
+        return len(self.parent) - 1
+
+    def children(self, node):
+        # the children that have been played out
+        first = self.first_child[node]
+        return range(first, first + self.tried[node]) if first != -1 else range(0)
+
+    def get_child(self, node, move):
+        for child in self.children(node):
+            if self.move[child] == move:
+                return child
+        return None
+
+    def is_fully_expanded(self, node):
+        return self.first_child[node] != -1 and self.tried[node] == self.child_count[node]
+
+    def add_children(self, node, moves, piece):
+        self.first_child[node] = len(self.parent)
+        self.child_count[node] = len(moves)
+        for col in moves:
+            self.append(node, col, piece)
+
+    def selection(self, node):
         # return child with largest UCT value
-        uct_val = lambda x: x.wins / x.visits + np.sqrt(2 * np.log(self.visits) / x.visits)
-        return sorted(self.children, key = uct_val)[-1]
-
-    def expand(self, move, board):
-        # return child when move is taken
-        # remove move from current node
-        child = Node(piece = board.PREV_PLAYER, board = board, parent = self, move = move)
-        self.available_moves.remove(move)
-        self.children.append(child)
-        return child
-
-    def update(self, result):
-        self.wins += result
-        self.visits += 1
+        log_visits = math.log(self.visits[node])
+        wins, visits = self.wins, self.visits
+        best, best_value = None, -math.inf
+        for child in self.children(node):
+            if self.proven[child] != self.UNPROVEN:
+                continue
+            value = wins[child] / visits[child] + math.sqrt(2 * log_visits / visits[child])
+            if value >= best_value:
+                best, best_value = child, value
+        return best
+
+    def expand(self, node):
+        # swap a random untried child to the end of the tried ones and return it
+        tried = self.first_child[node] + self.tried[node]
+        child = tried + random.randrange(self.child_count[node] - self.tried[node])
+        self.move[tried], self.move[child] = self.move[child], self.move[tried]
+        self.tried[node] += 1
+        return tried
+
+    def update(self, node, results, visits=1):
+        # results maps each piece to its summed result over visits playouts, added along the path up to the root
+        while node != -1:
+            self.wins[node] += results[self.piece[node]]
+            self.visits[node] += visits
+            node = self.parent[node]
+
+    def prove(self, node):
+        # passes the proof of node up to the ancestors it decides
+        while node != 0:
+            parent = self.parent[node]
+            if self.proven[node] == self.WIN:
+                # the player to move at parent has a winning move
+                self.proven[parent] = self.LOSS
+            elif self.is_fully_expanded(parent) and all(self.proven[child] != self.UNPROVEN for child in self.children(parent)):
+                self.proven[parent] = self.WIN - max(self.proven[child] for child in self.children(parent))
+            else:
+                return
+            node = parent
+
+    def best_move(self, node):
+        # proven wins first and proven results over win ratios, so proven losses come last
+        if not self.children(node):
+            return None
+        def value(child):
+            if self.proven[child] != self.UNPROVEN:
+                return self.proven[child] == self.WIN, self.proven[child] / self.WIN
+            return False, self.wins[child] / self.visits[child]
+        return self.move[max(self.children(node), key = value)]
+
+    def subtree(self, node, max_nodes=None):
+        """
+        A compacted copy of the subtree under node, with node as the new root
+        With max_nodes, children are copied for the most visited nodes first
+        and nodes whose children no longer fit become unexpanded leaves
+        """
+        tree = Tree(self.piece[node])
+        tree.wins[0], tree.visits[0], tree.proven[0] = self.wins[node], self.visits[node], self.proven[node]
+        heap = [(-self.visits[node], node, 0)]
+        while heap:
+            visits, old, new = heapq.heappop(heap)
+            first, count = self.first_child[old], self.child_count[old]
+            if first == -1 or (max_nodes is not None and len(tree) + count > max_nodes):
+                continue
+            tree.first_child[new] = len(tree)
+            tree.child_count[new] = count
+            tree.tried[new] = self.tried[old]
+            for child in range(first, first + count):
+                index = tree.append(new, self.move[child], self.piece[child], self.wins[child], self.visits[child], self.proven[child])
+                if self.first_child[child] != -1:
+                    heapq.heappush(heap, (-self.visits[child], child, index))
+        return tree
+
+    def compact(self, node=0, max_nodes=None):
+        # replaces the tree with subtree(node, max_nodes) in place
+        tree = self.subtree(node, max_nodes)
+        for name in self.ARRAYS:
+            setattr(self, name, getattr(tree, name))
+
+    def nbytes(self):
+        return sum(len(getattr(self, name)) * getattr(self, name).itemsize for name in self.ARRAYS)
@@ -0,0 +1,78 @@
+class MoveOrdering:
+    """
+    Orders the columns searched at each node so alpha-beta cuts off early
+
+    Moves are tried in this order, each heuristic can be switched off:
+    - hash_move: best move stored in the transposition table for the position
+    - killers: the last moves that caused a cutoff at the same ply
+    - history: columns that caused cutoffs anywhere, weighted by depth squared
+    - center: static center-out order, the tie breaker for everything else
+    With everything off, moves keep their left-to-right order.
+
+    Also counts how often the first move searched was the one that cut off,
+    a measure of how close the search is to the minimal tree.
+    """
+    KILLER_SLOTS = 2
+
+    def __init__(self, center=True, killers=True, history=True, hash_move=True, columns=7):
+        self.center = center
+        self.killers = killers
+        self.history = history
+        self.hash_move = hash_move
+
+        middle = (columns - 1) / 2
+        self.center_rank = [abs(col - middle) if center else 0 for col in range(columns)]
+        self.killer_moves = {}
+        self.history_scores = {1: [0] * columns, 2: [0] * columns}
+
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        # killers are position specific, history is aged rather than dropped
+        self.killer_moves = {}
+        for scores in self.history_scores.values():
+            for col in range(len(scores)):
+                scores[col] //= 2
+
+    def order(self, board, moves, hash_move=None):
+        if not self.hash_move:
+            hash_move = None
+        killers = self.killer_moves.get(board.num_slots_filled, ()) if self.killers else ()
+        history = self.history_scores[board.CURR_PLAYER] if self.history else None
+        center_rank = self.center_rank
+
+        def priority(col):
+            return (col != hash_move,
+                    col not in killers,
+                    -history[col] if history is not None else 0,
+                    center_rank[col])
+        return sorted(moves, key=priority)
+
+    def static_order(self, moves):
+        # center-out only, the same for every search whatever the heuristics have learned
+        return sorted(moves, key=lambda col: self.center_rank[col])
+
+    def record_cutoff(self, board, col, depth, index):
+        # index is the position of col in the ordered move list
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+        if self.killers:
+            killers = self.killer_moves.setdefault(board.num_slots_filled, [])
+            if col not in killers:
+                killers.insert(0, col)
+                del killers[self.KILLER_SLOTS:]
+        if self.history:
+            self.history_scores[board.CURR_PLAYER][col] += depth * depth
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def stats(self):
+        return {
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate(),
+        }
@@ -8,7 +8,7 @@ class OneStepLookAheadBot():
         else:
             self.opp_piece = 1
 
-    def get_move(self, board):
+    def get_move(self, board, deadline=None):
         valid_moves = board.get_valid_locations()
 
         win_move_set = set()
@@ -16,18 +16,17 @@ class OneStepLookAheadBot():
         stop_loss_move_set = set()
 
         for move in valid_moves:
-            bot_copy = board.copy_board()
-            player_copy = board.copy_board()
-
-            bot_copy.drop_piece(move, self.bot_piece)
-            if bot_copy.winning_move(self.bot_piece):
+            board.drop_piece(move, self.bot_piece)
+            if board.winner == self.bot_piece:
                 win_move_set.add(move)
+            board.undo_move()
 
-            player_copy.drop_piece(move, self.opp_piece)
-            if player_copy.winning_move(self.opp_piece):
+            board.drop_piece(move, self.opp_piece)
+            if board.winner == self.opp_piece:
                 stop_loss_move_set.add(move)
             else:
                 fallback_move_set.add(move)
+            board.undo_move()
 
         if len(win_move_set) > 0:
             ret_move = random.choice(list(win_move_set))
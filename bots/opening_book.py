@@ -0,0 +1,111 @@
+"""
+Precomputed opening moves, stored as a sorted binary file
+
+The file is a flat array of RECORD entries (little-endian uint64 position
+hash followed by the uint8 best column) sorted by hash, with no header.
+OpeningBook memory-maps it and binary searches for Board.canonical_key(),
+so nothing is read into memory until a position is probed. Mirror images
+share one record, whose column is in the canonical orientation.
+
+Build a book with:
+    python -m bots.opening_book --plies 4 --depth 7 --out book.bin
+"""
+import mmap
+import struct
+import argparse
+
+RECORD = struct.Struct('<QB')
+
+class OpeningBook:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = len(self.map) // RECORD.size
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, col = RECORD.unpack_from(self.map, mid * RECORD.size)
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                return col
+        return None
+
+    def probe(self, board):
+        # best move stored for the board's position, or None when out of book
+        key, mirrored = board.canonical_key()
+        col = self.lookup(key)
+        if col is not None and mirrored:
+            col = board.mirror_column(col)
+        if col is not None and board.is_valid_location(col):
+            self.hits += 1
+            return col
+        self.misses += 1
+        return None
+
+
+def book_positions(board, plies, seen):
+    # every non-terminal position reachable in at most plies moves, one per mirror pair
+    key, mirrored = board.canonical_key()
+    if board.winner is not None or board.check_draw() or key in seen:
+        return
+    seen[key] = board.copy_board()
+    if plies == 0:
+        return
+    for col in board.get_valid_locations():
+        board.drop_piece(col, board.CURR_PLAYER)
+        book_positions(board, plies - 1, seen)
+        board.undo_move()
+
+
+def build_book(path, plies, depth, bot_class=None, first_player=1, verbose=False):
+    """
+    Search every position up to plies moves deep with bot_class (MiniMaxBot
+    by default) at the given depth and write the best moves to path
+    """
+    from board.board import Board
+    if bot_class is None:
+        from bots.minimax import MiniMaxBot
+        bot_class = MiniMaxBot
+
+    positions = {}
+    book_positions(Board(first_player), plies, positions)
+
+    bots = {piece: bot_class(piece, depth=depth) for piece in (Board.PLAYER1_PIECE, Board.PLAYER2_PIECE)}
+    records = []
+    for i, (key, board) in enumerate(positions.items()):
+        col = bots[board.CURR_PLAYER].get_move(board)
+        records.append((key, board.mirror_column(col) if board.canonical_key()[1] else col))
+        if verbose and (i + 1) % 100 == 0:
+            print('searched %d / %d positions' % (i + 1, len(positions)))
+
+    records.sort()
+    with open(path, 'wb') as f:
+        for key, col in records:
+            f.write(RECORD.pack(key, col))
+    return len(records)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build an opening book for the Connect 4 bots.')
+    parser.add_argument('--plies', type=int, default=4, help='book every position up to this many moves deep')
+    parser.add_argument('--depth', type=int, default=7, help='minimax depth used to pick each book move')
+    parser.add_argument('--out', type=str, default='book.bin', help='output file')
+    args = parser.parse_args()
+
+    count = build_book(args.out, args.plies, args.depth, verbose=True)
+    print('wrote %d positions to %s' % (count, args.out))
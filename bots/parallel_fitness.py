@@ -0,0 +1,48 @@
+import numpy as np
+from board.board import Board
+from bots.process_pool import WorkerPool, worker
+
+def _setup_worker(bot_class, piece, bot_options):
+    worker['bot'] = bot_class(piece, **bot_options)
+    worker['search_id'] = None
+
+def _evaluate(position, sequences, search_id):
+    bot = worker['bot']
+    # the caches hold on for every generation of one move, like the parent's would
+    if search_id != worker['search_id']:
+        worker['search_id'] = search_id
+        bot.clear_cache()
+    board = Board(bot.piece)
+    board.board = np.frombuffer(position, dtype=np.int8).reshape(board.ROW_COUNT, board.COLUMN_COUNT).astype(int)
+    hits, misses = bot.cache_hits['prefix'], bot.cache_misses['prefix']
+    scores = bot.evaluate_population(board, [list(sequence) for sequence in sequences])
+    return scores, bot.cache_hits['prefix'] - hits, bot.cache_misses['prefix'] - misses
+
+class ParallelFitness(WorkerPool):
+    """
+    Evaluates GeneticAlgorithmBot populations across a process pool
+
+    Workers are sent the position as the bytes of an int8 grid plus tuples
+    of moves, never a Board, and each holds its own copy of the bot with its
+    own prefix caches. The sequences are sorted before being split so that
+    sequences sharing a prefix land on the same worker.
+    """
+    def __init__(self, bot_class, piece, workers, **bot_options):
+        super().__init__(workers, _setup_worker, bot_class, piece, bot_options)
+        self.search_id = 0
+
+    def new_search(self):
+        # workers drop their caches at the next evaluate after this
+        self.search_id += 1
+
+    def evaluate(self, board, sequences):
+        # (fitness of every sequence (tuples of moves) from board as a dict keyed by sequence,
+        # prefix cache hits, prefix cache misses) summed over the workers
+        position = board.get_board().astype(np.int8).tobytes()
+        sequences = sorted(sequences)
+        size = -(-len(sequences) // self.workers)
+        chunks = [sequences[i:i+size] for i in range(0, len(sequences), size)]
+        futures = [self.submit(_evaluate, position, chunk, self.search_id) for chunk in chunks]
+        results = [future.result() for future in futures]
+        scores = dict(zip(sequences, (score for chunk_scores, _, _ in results for score in chunk_scores)))
+        return scores, sum(result[1] for result in results), sum(result[2] for result in results)
@@ -0,0 +1,59 @@
+import time
+import random
+import numpy as np
+from bots import playout
+from bots.process_pool import WorkerPool, worker
+
+def _setup_worker(bot_class, piece):
+    # forked workers would otherwise all replay the parent's random sequence
+    random.seed()
+    np.random.seed()
+    worker['bot'] = bot_class(piece, endgame_threshold=None)
+
+def _root_search(board, max_iterations, timeout):
+    return worker['bot'].root_statistics(board, max_iterations, timeout)
+
+def _playouts(current, mask, count):
+    return playout.random_playouts(current, mask, count).sum()
+
+class ParallelMCTS(WorkerPool):
+    """
+    Spreads the MonteCarloBot iterations across a process pool
+
+    - 'root': every worker grows its own tree from the root position with
+      its share of the iterations, and the visits and wins of the root
+      children are summed over the workers to pick the move
+    - 'leaf': the bot grows a single tree, but every rollout is a batch of
+      leaf_playouts random playouts from the leaf on each worker, played in
+      lockstep by playout.random_playouts, and the whole batch is backed up
+      at once
+    """
+    MODES = ('root', 'leaf')
+    DEFAULT_LEAF_PLAYOUTS = 16
+
+    def __init__(self, bot_class, piece, workers, mode='root', leaf_playouts=DEFAULT_LEAF_PLAYOUTS):
+        if mode not in self.MODES:
+            raise ValueError("unknown parallel mode: " + str(mode))
+        super().__init__(workers, _setup_worker, bot_class, piece)
+        self.mode = mode
+        self.leaf_playouts = leaf_playouts
+
+    def get_move(self, board, max_iterations, timeout):
+        # root parallel search, the workers stop on their own when timeout (seconds) runs out
+        start = time.perf_counter()
+        self.start()
+        iterations = -(-max_iterations // self.workers)
+        remaining = timeout - (time.perf_counter() - start)
+        futures = [self.submit(_root_search, board, iterations, remaining) for _ in range(self.workers)]
+
+        wins, visits = {}, {}
+        for future in futures:
+            for move, child_wins, child_visits in future.result():
+                wins[move] = wins.get(move, 0) + child_wins
+                visits[move] = visits.get(move, 0) + child_visits
+        return max(visits, key=lambda move: wins[move] / visits[move])
+
+    def playouts(self, current, mask):
+        # (sum of results, number of playouts) for a batch of playouts from the position
+        futures = [self.submit(_playouts, current, mask, self.leaf_playouts) for _ in range(self.workers)]
+        return sum(future.result() for future in futures), self.workers * self.leaf_playouts
@@ -0,0 +1,79 @@
+import math
+import multiprocessing
+from bots.process_pool import WorkerPool, worker
+
+def _setup_worker(bot_class, piece, bot_options, shared_alpha):
+	worker['bot'] = bot_class(piece, **bot_options)
+	worker['shared_alpha'] = shared_alpha
+	worker['search_id'] = None
+
+def _search_root_move(board, col, depth, search_id):
+	bot = worker['bot']
+	search = bot.search
+	shared_alpha = worker['shared_alpha']
+
+	# tables from an earlier move could hold deeper results than a serial search would see
+	if search_id != worker['search_id']:
+		worker['search_id'] = search_id
+		if search.transposition_table is not None:
+			search.transposition_table.clear()
+		search.move_ordering.new_search()
+
+	# alpha - 1 rather than alpha: a move tying the best so far still gets an
+	# exact score, so ties are broken by root order exactly as in the serial search
+	alpha = shared_alpha.value
+	nodes = search.nodes
+	board.drop_piece(col, board.CURR_PLAYER)
+	bot.start_tracking(board)
+	try:
+		score = -search.negamax(board, depth-1, -math.inf, 1 - alpha)[1]
+	finally:
+		bot.stop_tracking(board)
+
+	with shared_alpha.get_lock():
+		if score > shared_alpha.value:
+			shared_alpha.value = score
+	return score, search.nodes - nodes
+
+class ParallelRootSearch(WorkerPool):
+	"""
+	Splits the root moves of a NegamaxSearch bot across a process pool
+
+	Each worker process holds its own copy of the bot (with its own
+	transposition table). The first root move is searched alone to get an
+	alpha bound, then the remaining moves are searched in parallel, each
+	starting from the best score any worker has reported so far through a
+	shared value. The chosen move is the same one the serial search picks
+	at the same depth from a fresh table: the highest score, ties going to
+	the earliest move in the static root order.
+
+	The shared value is read when a worker starts a root move, bounds found
+	by other workers while that move is being searched are not picked up.
+	"""
+	def __init__(self, bot_class, piece, workers, **bot_options):
+		self.shared_alpha = multiprocessing.Value('d', -math.inf)
+		super().__init__(workers, _setup_worker, bot_class, piece, bot_options, self.shared_alpha)
+		self.search_id = 0
+		self.nodes = 0
+
+	def get_move(self, board, depth, move_ordering):
+		valid_locations = board.get_valid_locations()
+		if depth == 0 or board.winner is not None or not valid_locations:
+			return None
+
+		self.search_id += 1
+		self.shared_alpha.value = -math.inf
+		position = board.copy_board()
+		root_moves = move_ordering.static_order(valid_locations)
+
+		first = self.submit(_search_root_move, position, root_moves[0], depth, self.search_id)
+		results = [first.result()]
+		futures = [self.submit(_search_root_move, position, col, depth, self.search_id) for col in root_moves[1:]]
+		results += [future.result() for future in futures]
+
+		column, value = None, -math.inf
+		for col, (score, nodes) in zip(root_moves, results):
+			self.nodes += nodes
+			if score > value:
+				column, value = col, score
+		return column
@@ -0,0 +1,100 @@
+"""
+Random playouts on bitboards, for the MCTS rollouts
+
+Positions are a pair of ints in the BitBoard bit layout (bit col * 7 + row):
+current holds the stones of the player to move and mask every stone. Both
+are plain ints, so a position is copied by assignment and never undone.
+"""
+import random
+import numpy as np
+from board.bitboard import BitBoard
+from bots.solver import WIDTH, BOTTOM, TOP, COLUMN, EndgameSolver
+
+aligned = EndgameSolver.aligned
+
+# the same masks and shifts as numpy uint64, for the lockstep playouts
+BOTTOMS = np.array(BOTTOM, dtype=np.uint64)
+TOPS = np.array(TOP, dtype=np.uint64)
+COLUMNS = np.array(COLUMN, dtype=np.uint64)
+SHIFTS = [(np.uint64(shift), np.uint64(2 * shift)) for shift in BitBoard.DIRECTIONS]
+
+def position(board):
+    # (current, mask) for any Board
+    masks = [0, 0, 0]
+    grid = board.get_board()
+    for r in range(board.ROW_COUNT):
+        for c in range(board.COLUMN_COUNT):
+            piece = int(grid[r][c])
+            if piece != board.EMPTY:
+                masks[piece] |= 1 << (c * (board.ROW_COUNT + 1) + r)
+    return masks[board.CURR_PLAYER], masks[board.PLAYER1_PIECE] | masks[board.PLAYER2_PIECE]
+
+def valid_moves(mask):
+    return [col for col in range(WIDTH) if not mask & TOP[col]]
+
+def play(current, mask, col):
+    # the position after the player to move drops in col, seen from the opponent
+    return current ^ mask, mask | (mask + BOTTOM[col])
+
+def is_lost(current, mask):
+    # whether the player who just moved has four in a row
+    return aligned(current ^ mask)
+
+def random_playout(current, mask, choice=random.choice):
+    """
+    Plays uniformly random moves until the game ends
+    Returns the result for the player to move: 1 for a win, 0 for a loss
+    and 0.5 for a draw. The position must not already be won
+    """
+    playable = valid_moves(mask)
+    result = 1
+    while playable:
+        col = choice(playable)
+        move = (mask + BOTTOM[col]) & COLUMN[col]
+        mover = current | move
+        if aligned(mover):
+            return result
+        mask |= move
+        if mask & TOP[col]:
+            playable.remove(col)
+        current = mask ^ mover
+        result = 1 - result
+    return 0.5
+
+def aligned_many(pos):
+    # aligned for every bitboard of a uint64 array
+    found = np.zeros(len(pos), dtype=bool)
+    for shift, double in SHIFTS:
+        m = pos & (pos >> shift)
+        found |= (m & (m >> double)) != 0
+    return found
+
+def random_playouts(current, mask, count, rng=np.random):
+    """
+    Plays count random games from the position at once, one ply of every
+    game per numpy step, and returns their results as random_playout would
+    """
+    current = np.full(count, current, dtype=np.uint64)
+    mask = np.full(count, mask, dtype=np.uint64)
+    results = np.full(count, 0.5)
+    active = np.arange(count)
+    result = 1
+    while len(active):
+        # a uniformly random playable column per game, games with none left are draws
+        playable = (mask[active, None] & TOPS) == 0
+        has_move = playable.any(axis=1)
+        active, playable = active[has_move], playable[has_move]
+        if not len(active):
+            break
+        col = np.argmax(rng.random_sample(playable.shape) * playable, axis=1)
+
+        move = (mask[active] + BOTTOMS[col]) & COLUMNS[col]
+        mover = current[active] | move
+        won = aligned_many(mover)
+        results[active[won]] = result
+
+        mask[active] |= move
+        current[active] = mask[active] ^ mover
+        active = active[~won]
+        result = 1 - result
+    return results
@@ -0,0 +1,35 @@
+import threading
+
+class Ponderer:
+    """
+    Runs a bot's search in a background thread while the opponent thinks
+
+    start(search) calls search(stop) in a daemon thread, where stop is a
+    threading.Event the search must poll and return on. stop() sets it,
+    calls interrupt while the thread is still running (for searches that
+    can only be cut short from outside) and waits for the thread, so the
+    bot's own state is safe to use again.
+    The thread shares the GIL, so pondering is only free time against a
+    human or a bot running in another process.
+    """
+    def __init__(self):
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def is_pondering(self):
+        return self.thread is not None
+
+    def start(self, search):
+        self.stop()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=search, args=(self.stop_event,), daemon=True)
+        self.thread.start()
+
+    def stop(self, interrupt=None):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        if interrupt is not None and self.thread.is_alive():
+            interrupt()
+        self.thread.join()
+        self.thread = None
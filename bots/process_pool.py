@@ -0,0 +1,36 @@
+from concurrent.futures import ProcessPoolExecutor
+
+# per-process state of the pool workers, filled in once by the pool's setup function
+worker = {}
+
+def _init_worker(setup, args):
+    setup(*args)
+
+class WorkerPool:
+    """
+    A process pool started on first use and kept until close, so it is paid
+    for once per bot rather than per move
+
+    setup(*args) runs once in every worker process to fill in the worker
+    dict, which the functions submitted to the pool then read. setup and
+    those functions must be module level so they can be pickled.
+    """
+    def __init__(self, workers, setup, *args):
+        self.workers = workers
+        self.setup = setup
+        self.args = args
+        self.executor = None
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.setup, self.args))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def submit(self, fn, *args):
+        self.start()
+        return self.executor.submit(fn, *args)
@@ -4,5 +4,5 @@ class RandomBot:
     def __init__(self, piece):
         self.bot_piece = piece
 
-    def get_move(self, board):
+    def get_move(self, board, deadline=None):
         return random.randint(0, board.COLUMN_COUNT-1)
@@ -0,0 +1,186 @@
+import math
+import time
+from bots.move_ordering import MoveOrdering
+
+class SearchTimeout(Exception):
+	pass
+
+class NegamaxSearch:
+	"""
+	Alpha-beta search shared by the minimax-family bots
+
+	Scores are negamax scores: from the point of view of the player to move.
+	The evaluation (a bots.evaluation.Evaluation, usually the bot itself)
+	scores leaves from its bot_piece's point of view and is negated when the
+	opponent is to move. Moves after the first are searched with a null
+	window first (principal variation search) and only re-searched with the
+	full window when they might be better.
+
+	Bots configure it rather than writing their own recursion:
+	- chance_policy(scores): when given, nodes where the opponent moves are
+	  chance nodes valued by this function of all child scores (seen from
+	  the opponent) instead of by the opponent's best reply
+	- acceptance(board, score, value): decides whether a move scoring score
+	  replaces the best value so far, defaults to score > value
+	"""
+	WINNING_SCORE = 100000000000000
+	LOSING_SCORE = -10000000000000
+
+	def __init__(self, evaluation, transposition_table=None, move_ordering=None,
+			principal_variation=True, chance_policy=None, acceptance=None):
+		self.evaluation = evaluation
+		self.transposition_table = transposition_table
+		self.move_ordering = move_ordering if move_ordering is not None else MoveOrdering()
+		self.principal_variation = principal_variation
+		self.chance_policy = chance_policy
+		self.acceptance = acceptance
+
+		self.deadline = None
+		self.completed_depth = 0
+		self.nodes = 0
+
+	def leaf_score(self, board):
+		evaluation = self.evaluation
+		if board.winner == evaluation.bot_piece:
+			score = self.WINNING_SCORE
+		elif board.winner == evaluation.opp_piece:
+			score = self.LOSING_SCORE
+		elif board.check_draw():
+			score = 0
+		else:
+			score = evaluation.score_position(board)
+		return score if board.CURR_PLAYER == evaluation.bot_piece else -score
+
+	def negamax(self, board, depth, alpha, beta, first_move=None, moves=None):
+		# moves, when given, replaces the move ordering's list for this node
+		if self.deadline is not None and time.perf_counter() > self.deadline:
+			raise SearchTimeout()
+		self.nodes += 1
+
+		if depth == 0 or self.evaluation.is_terminal_node(board):
+			return None, self.leaf_score(board)
+
+		if self.chance_policy is not None and board.CURR_PLAYER != self.evaluation.bot_piece:
+			return self.chance_node(board, depth)
+
+		tt = self.transposition_table
+		hash_move = None
+		if tt is not None:
+			# mirrored positions share an entry, its move is stored in the canonical orientation
+			key, mirrored = board.canonical_key()
+			entry, alpha, beta = tt.lookup(key, depth, alpha, beta)
+			if entry is not None:
+				hash_move = entry.move
+				if mirrored and hash_move is not None:
+					hash_move = board.mirror_column(hash_move)
+				if alpha >= beta:
+					return hash_move, entry.score
+		window = (alpha, beta)
+
+		if moves is not None:
+			valid_locations = list(moves)
+		else:
+			valid_locations = self.move_ordering.order(board, board.get_valid_locations(), hash_move)
+		if first_move in valid_locations:
+			valid_locations.remove(first_move)
+			valid_locations.insert(0, first_move)
+
+		value = -math.inf
+		column = valid_locations[0]
+		for index, col in enumerate(valid_locations):
+			board.drop_piece(col, board.CURR_PLAYER)
+			if index == 0 or not self.principal_variation:
+				score = -self.negamax(board, depth-1, -beta, -alpha)[1]
+			else:
+				score = -self.negamax(board, depth-1, -alpha-1, -alpha)[1]
+				if alpha < score < beta:
+					score = -self.negamax(board, depth-1, -beta, -alpha)[1]
+			board.undo_move()
+
+			if self.acceptance is not None:
+				accepted = self.acceptance(board, score, value)
+			else:
+				accepted = score > value
+			if accepted:
+				value = score
+				column = col
+
+			alpha = max(alpha, value)
+			if alpha >= beta:
+				self.move_ordering.record_cutoff(board, col, depth, index)
+				break
+
+		if tt is not None:
+			tt.store(key, depth, value, board.mirror_column(column) if mirrored else column, *window)
+		return column, value
+
+	def chance_node(self, board, depth):
+		# every reply is searched with a full window, the policy combines them
+		scores = []
+		for col in board.get_valid_locations():
+			board.drop_piece(col, board.CURR_PLAYER)
+			scores.append(-self.negamax(board, depth-1, -math.inf, math.inf)[1])
+			board.undo_move()
+		return None, self.chance_policy(scores)
+
+	def iterative_deepening(self, board, time_limit, stop=None):
+		# search depth 1, 2, ... until the deadline or until the stop event is set,
+		# keeping the move of the last completed depth
+		root_moves = len(board.move_stack)
+		max_depth = board.ROW_COUNT * board.COLUMN_COUNT - board.get_num_slots_filled()
+		col = None
+		self.completed_depth = 0
+		start = time.perf_counter()
+
+		for depth in range(1, max_depth+1):
+			# depth 1 always completes so there is a move to fall back on
+			self.deadline = start + time_limit if depth > 1 else None
+			# checked after the deadline is set, so interrupt can not be overwritten by it
+			if stop is not None and stop.is_set():
+				break
+			try:
+				col, score = self.negamax(board, depth, -math.inf, math.inf, first_move=col)
+			except SearchTimeout:
+				while len(board.move_stack) > root_moves:
+					board.undo_move()
+				break
+			self.completed_depth = depth
+
+		self.deadline = None
+		return col
+
+	def ponder(self, board, stop):
+		# deepens on board until stop is set, leaving the results in the transposition table
+		self.move_ordering.new_search()
+		self.evaluation.start_tracking(board)
+		try:
+			self.iterative_deepening(board, math.inf, stop)
+		finally:
+			self.evaluation.stop_tracking(board)
+
+	def interrupt(self):
+		# makes a running search raise SearchTimeout at its next node
+		self.deadline = -math.inf
+
+	def time_left(self, deadline, default=None):
+		# seconds until deadline (a time.perf_counter() value), or default without one
+		if deadline is None:
+			return default
+		return max(0, deadline - time.perf_counter())
+
+	def get_move(self, board, depth, time_limit=None):
+		# with a time_limit (seconds) the search deepens iteratively instead of using depth
+		self.move_ordering.new_search()
+		self.evaluation.start_tracking(board)
+		try:
+			if time_limit is None:
+				# root moves in static order, so equal scores go to the same move whatever the history
+				# scores are, as in ParallelRootSearch
+				root_moves = self.move_ordering.static_order(board.get_valid_locations())
+				col, score = self.negamax(board, depth, -math.inf, math.inf, moves=root_moves)
+				self.completed_depth = depth
+			else:
+				col = self.iterative_deepening(board, time_limit)
+		finally:
+			self.evaluation.stop_tracking(board)
+		return col
@@ -1,80 +1,33 @@
-import random
 import math
 from bots.evaluation import Evaluation
+from bots.transposition import TranspositionTable
+from bots.search import NegamaxSearch
 
 class SimulatedAnnealingBot(Evaluation):
 	ACCEPTANCE_PROBABILITY_TRESHOLD = 0.7
 	LIMIT_CONSIDERABLE_SLOT_PERCENTAGE = 0.7
-	WINNING_POINT = 100000000000000
-	LOSING_POINT = -10000000000000
 	K = 10
-	def __init__(self, piece, depth=1):
+	def __init__(self, piece, depth=1, tt_size=None, tt_replacement='depth', move_ordering=None):
 		super().__init__(piece)
 		self.depth = depth
+		transposition_table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+		# worse moves may be accepted, so null-window bounds would not hold
+		self.search = NegamaxSearch(self, transposition_table, move_ordering,
+			principal_variation=False, acceptance=self.accept)
 
-	def simulated_annealing(self, board, depth, alpha, beta, maximizingPlayer):
-		valid_locations = board.get_valid_locations()
-		is_terminal = super().is_terminal_node(board)
+	def temperature(self, board):
 		slots_filled = board.get_num_slots_filled()
-		temperature = self.K * ((board.ROW_COUNT * board.COLUMN_COUNT) * self.LIMIT_CONSIDERABLE_SLOT_PERCENTAGE - slots_filled) / (board.ROW_COUNT * board.COLUMN_COUNT)
-		
-
-		if depth == 0 or is_terminal:
-			if is_terminal:
-				if board.winning_move(self.bot_piece):
-					return (None, self.WINNING_POINT)
-				elif board.winning_move(self.opp_piece):
-					return (None, self.LOSING_POINT)
-				else: # Game is over, no more valid moves
-					return (None, 0)
-			else: # Depth is zero
-				return (None, super().score_position(board))
-
-		if maximizingPlayer:
-			value = self.LOSING_POINT
-			column = random.choice(valid_locations)
-			for col in valid_locations:
-				b_copy = board.copy_board()
-				b_copy.drop_piece(col, self.bot_piece)
-				new_score = self.simulated_annealing(b_copy, depth-1, alpha, beta, False)[1]
-
-				if new_score >= value:
-					value = new_score
-					column = col
-				elif temperature > 0:
-					acceptance_prob = math.exp((new_score - value) / temperature)
-					print("temperature:", temperature)
-					print("acceptance_prob:", acceptance_prob)
-					if self.ACCEPTANCE_PROBABILITY_TRESHOLD < acceptance_prob:
-						value = new_score
-						column = col
-
-				alpha = max(alpha, value)
-				if alpha >= beta:
-					break
-			return column, value
-		else: # Minimizing player
-			value = self.WINNING_POINT
-			column = random.choice(valid_locations)
-			for col in valid_locations:
-				b_copy = board.copy_board()
-				b_copy.drop_piece(col, self.opp_piece)
-				new_score = self.simulated_annealing(b_copy, depth-1, alpha, beta, True)[1]
-
-				if new_score <= value:
-					value = new_score
-					column = col
-				elif temperature > 0:
-					acceptance_prob = math.exp((value - new_score) / temperature)
-					if self.ACCEPTANCE_PROBABILITY_TRESHOLD < acceptance_prob:
-						value = new_score
-						column = col
-
-				beta = min(beta, value)
-				if alpha >= beta:
-					break
-			return column, value
-
-	def get_move(self, board):
-		col, simulated_annealing_score = self.simulated_annealing(board, self.depth, -math.inf, math.inf, True)
-		return col
\ No newline at end of file
+		return self.K * ((board.ROW_COUNT * board.COLUMN_COUNT) * self.LIMIT_CONSIDERABLE_SLOT_PERCENTAGE - slots_filled) / (board.ROW_COUNT * board.COLUMN_COUNT)
+
+	def accept(self, board, score, value):
+		if score >= value:
+			return True
+		temperature = self.temperature(board)
+		if temperature > 0:
+			acceptance_prob = math.exp((score - value) / temperature)
+			return self.ACCEPTANCE_PROBABILITY_TRESHOLD < acceptance_prob
+		return False
+
+	def get_move(self, board, deadline=None):
+		# with a deadline (a time.perf_counter() value) the search deepens until it instead of using depth
+		return self.search.get_move(board, self.depth, self.search.time_left(deadline))
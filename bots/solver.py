@@ -0,0 +1,123 @@
+from board.bitboard import BitBoard
+
+WIDTH = BitBoard.COLUMN_COUNT
+HEIGHT = BitBoard.ROW_COUNT
+H1 = BitBoard.HEIGHT
+
+# per column: the bottom cell, the top cell and every cell of the column
+BOTTOM = [1 << (col * H1) for col in range(WIDTH)]
+TOP = [1 << (HEIGHT - 1 + col * H1) for col in range(WIDTH)]
+COLUMN = [((1 << HEIGHT) - 1) << (col * H1) for col in range(WIDTH)]
+# all H1 bits of a column, current + mask can carry into the bit above the top cell
+COLUMN_BITS = (1 << H1) - 1
+CENTER_ORDER = sorted(range(WIDTH), key=lambda col: abs(col - WIDTH // 2))
+
+def mirror(bits):
+    # the bitboard reflected left-right, column by column
+    mirrored = 0
+    for col in range(WIDTH):
+        mirrored |= ((bits >> (col * H1)) & COLUMN_BITS) << ((WIDTH - 1 - col) * H1)
+    return mirrored
+
+class EndgameSolver:
+    """
+    Exact alpha-beta solver for positions with few empty cells
+
+    Works on bitboards (BitBoard layout): current holds the stones of the
+    player to move and mask all stones. Scores are from the player to move:
+    positive is a forced win, negative a forced loss and 0 a draw, and the
+    magnitude grows the sooner the game is decided (a win with your k-th
+    from last stone scores k). Upper bounds of searched positions are kept
+    in a bounded transposition table keyed by current + mask, which is
+    unique per position, or by its mirror image when that is smaller.
+    Only scores are stored, so mirrored positions share entries as is.
+    """
+    CELLS = WIDTH * HEIGHT
+
+    DEFAULT_THRESHOLD = 16
+    DEFAULT_TABLE_SIZE = 1 << 20
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, table_size=DEFAULT_TABLE_SIZE):
+        self.threshold = threshold
+        self.table_size = table_size
+        self.table = {}
+        self.nodes = 0
+
+    def should_solve(self, board):
+        empty = board.ROW_COUNT * board.COLUMN_COUNT - board.get_num_slots_filled()
+        return board.winner is None and 0 < empty <= self.threshold
+
+    @staticmethod
+    def aligned(pos):
+        for shift in BitBoard.DIRECTIONS:
+            m = pos & (pos >> shift)
+            if m & (m >> (2 * shift)):
+                return True
+        return False
+
+    def is_winning_move(self, current, mask, col):
+        return self.aligned(current | ((mask + BOTTOM[col]) & COLUMN[col]))
+
+    def negamax(self, current, mask, moves, alpha, beta):
+        self.nodes += 1
+        if moves == self.CELLS:
+            return 0
+
+        for col in range(WIDTH):
+            if not mask & TOP[col] and self.is_winning_move(current, mask, col):
+                return (self.CELLS + 1 - moves) // 2
+
+        upper = (self.CELLS - 1 - moves) // 2
+        key = current + mask
+        key = min(key, mirror(key))
+        stored = self.table.get(key)
+        if stored is not None:
+            upper = stored
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        for col in CENTER_ORDER:
+            if not mask & TOP[col]:
+                score = -self.negamax(current ^ mask, mask | (mask + BOTTOM[col]), moves + 1, -beta, -alpha)
+                if score >= beta:
+                    return score
+                if score > alpha:
+                    alpha = score
+
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = alpha
+        return alpha
+
+    def solve(self, board):
+        """
+        Returns (score, col): the exact score of the position for the
+        player to move and a move achieving it
+        """
+        position = board if isinstance(board, BitBoard) else BitBoard.from_board(board)
+        current = position.masks[board.CURR_PLAYER]
+        mask = position.masks[board.PLAYER1_PIECE] | position.masks[board.PLAYER2_PIECE]
+        moves = board.get_num_slots_filled()
+
+        playable = [col for col in CENTER_ORDER if not mask & TOP[col]]
+        for col in playable:
+            if self.is_winning_move(current, mask, col):
+                return (self.CELLS + 1 - moves) // 2, col
+
+        best_col = playable[0]
+        alpha = -self.CELLS
+        for col in playable:
+            score = -self.negamax(current ^ mask, mask | (mask + BOTTOM[col]), moves + 1, -self.CELLS, -alpha)
+            if score > alpha:
+                alpha = score
+                best_col = col
+        return alpha, best_col
+
+    def get_move(self, board):
+        # the optimal move if the board is within the threshold, otherwise None
+        if not self.should_solve(board):
+            return None
+        score, col = self.solve(board)
+        return col
@@ -0,0 +1,96 @@
+from collections import namedtuple
+
+Entry = namedtuple('Entry', ['key', 'depth', 'flag', 'score', 'move'])
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results keyed by Board.canonical_key(), so
+    a position and its mirror image share one entry
+
+    Each slot holds one Entry. The score is exact or a lower/upper bound
+    depending on where it fell relative to the search window. When two
+    positions map to the same slot, the replacement policy decides which
+    one is kept:
+    - 'depth': keep the entry searched to the greater depth
+    - 'always': the newest entry always wins
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    DEFAULT_SIZE = 1 << 18
+    REPLACEMENT_POLICIES = ('depth', 'always')
+
+    def __init__(self, size=DEFAULT_SIZE, replacement='depth'):
+        if replacement not in self.REPLACEMENT_POLICIES:
+            raise ValueError("unknown replacement policy: " + str(replacement))
+        self.size = size
+        self.replacement = replacement
+        self.slots = [None] * size
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def lookup(self, key, depth, alpha, beta):
+        """
+        Probe for a result usable at this depth
+        Returns (entry, alpha, beta) where entry is whatever is stored for the
+        key, so its move can still order the search. If it was searched deep
+        enough the window is narrowed by its score, and alpha >= beta means
+        entry.score can be returned as is
+        """
+        entry = self.probe(key)
+        if entry is None or entry.depth < depth:
+            return entry, alpha, beta
+        if entry.flag == self.EXACT:
+            return entry, entry.score, entry.score
+        if entry.flag == self.LOWER:
+            alpha = max(alpha, entry.score)
+        else:
+            beta = min(beta, entry.score)
+        return entry, alpha, beta
+
+    def store(self, key, depth, score, move, alpha, beta):
+        # alpha and beta are the window the node was searched with
+        if score <= alpha:
+            flag = self.UPPER
+        elif score >= beta:
+            flag = self.LOWER
+        else:
+            flag = self.EXACT
+
+        index = key % self.size
+        existing = self.slots[index]
+        if existing is not None and existing.key != key:
+            self.collisions += 1
+            if self.replacement == 'depth' and existing.depth > depth:
+                return
+        self.slots[index] = Entry(key, depth, flag, score, move)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'used': self.size - self.slots.count(None),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate(),
+            'stores': self.stores,
+            'collisions': self.collisions,
+        }
@@ -53,11 +53,40 @@ def check_win(piece):
 		return True
 	return False
 
-def connect4(p1, p2, ui=True, show_board=True):
+def lost_on_time(piece):
+	if graphics:
+		gb.write_on_board("PLAYER " + str(piece) + " OUT OF TIME!", PLAYER_COLOUR[piece - 1], 350, 50, 60, True)
+		gb.update_gboard()
+	print("\nPLAYER " + str(piece) + " RAN OUT OF TIME!")
+	return board.get_opp_player(piece)
+
+# share of move_time held back from the bots' deadline, for the time they take to notice it
+# and return, so that a bot stopping right at its deadline stays on the clock
+CLOCK_MARGIN = 0.25
+
+def bot_deadline(start, move_time):
+	if move_time is None:
+		return None
+	return start + move_time * (1 - CLOCK_MARGIN)
+
+def within_clock(reserves, piece, elapsed, move_time, increment):
+	# the player gains increment, and time over move_time is taken from what it has saved
+	if move_time is None:
+		return True
+	reserves[piece] += increment - max(0, elapsed - move_time)
+	return reserves[piece] >= 0
+
+def connect4(p1, p2, ui=True, show_board=True, board_class=Board, move_time=None, increment=0):
+	"""
+	With move_time (seconds), every move is played on a clock: bots are
+	given get_move(board, deadline) with a deadline CLOCK_MARGIN of move_time
+	short of the full move, and a player taking longer than move_time plus
+	the increments it has saved up loses on time
+	"""
 	global game_over, board, gb, graphics, turn
 	graphics=ui
 
-	board = Board(turn)
+	board = board_class(turn)
 	board.print_board()
 
 	game_over = False
@@ -70,14 +99,17 @@ def connect4(p1, p2, ui=True, show_board=True):
 
 	time_p1 = time_p2 = 0
 	moves_count_p1 = moves_count_p2 = 0
+	reserves = {board.PLAYER1_PIECE: 0, board.PLAYER2_PIECE: 0}
 
 	while not game_over:
 		# Player1's Input
 		start = time.perf_counter()
 		if turn == board.PLAYER1_PIECE and not game_over:
-			col = p1.get_move(board)
+			col = p1.get_move(board, deadline=bot_deadline(start, move_time))
 
-			if board.is_valid_location(col):
+			if not within_clock(reserves, board.PLAYER1_PIECE, time.perf_counter() - start, move_time, increment):
+				game_over = lost_on_time(board.PLAYER1_PIECE)
+			elif board.is_valid_location(col):
 				board.drop_piece(col, board.PLAYER1_PIECE)
 				moves_count_p1 += 1
 				next_turn(show_board)
@@ -89,9 +121,11 @@ def connect4(p1, p2, ui=True, show_board=True):
 		# Player2's Input
 		start = time.perf_counter()
 		if turn == board.PLAYER2_PIECE and not game_over:
-			col = p2.get_move(board)
+			col = p2.get_move(board, deadline=bot_deadline(start, move_time))
 
-			if board.is_valid_location(col):
+			if not within_clock(reserves, board.PLAYER2_PIECE, time.perf_counter() - start, move_time, increment):
+				game_over = lost_on_time(board.PLAYER2_PIECE)
+			elif board.is_valid_location(col):
 				board.drop_piece(col, board.PLAYER2_PIECE)
 				moves_count_p2 += 1
 				next_turn(show_board)
@@ -101,6 +135,13 @@ def connect4(p1, p2, ui=True, show_board=True):
 		time_p2 += (end - start)
 
 		if game_over:
+			# bots pondering on a finished game would hold on to the CPU, and their process pools
+			# would outlive them
+			for player in (p1, p2):
+				if hasattr(player, 'stop_pondering'):
+					player.stop_pondering()
+				if hasattr(player, 'close_pool'):
+					player.close_pool()
 			pygame.time.wait(1000)
 			board.print_board()
 			print("\nPlayer 1 {}".format(p1.__class__.__name__))
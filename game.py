@@ -54,9 +54,13 @@ def main(first_player = None, second_player = None):
     parser.add_argument('--p2', help='Player 2 type (default Human)', type=str)
     parser.add_argument('--ui', help='turn UI off in case of a bot vs bot match', type=str2bool, nargs='?', const=True, default=True)
     parser.add_argument('--bots', help='Lists the Bots available to play with', type=str2bool, nargs='?', const=True, default=False)
+    parser.add_argument('--bitboard', help='Use the bitboard-backed board for faster bot searches', type=str2bool, nargs='?', const=True, default=False)
+    parser.add_argument('--move_time', help='Seconds each player gets per move, bots search until this deadline', type=float, default=None)
+    parser.add_argument('--increment', help='Seconds added to a player\'s reserve after every move, used when a move overruns move_time', type=float, default=0)
 
     parser.add_argument('--competition', help='Sets the competition mode where multiple bots can play against each other in a league style', type=str2bool, nargs='?', const=True, default=False)
     args = parser.parse_args()
+    board_class = BitBoard if args.bitboard else Board
 
     if args.competition:
         bot_list = list(bot_map.values())[2:]
@@ -81,7 +85,8 @@ def main(first_player = None, second_player = None):
                     print(f"Game {game_num + 1} of {TOTAL_GAMES}")
                     p1 = bot1_class(Board.PLAYER1_PIECE) if game_num % 2 == 0 else bot2_class(Board.PLAYER1_PIECE)
                     p2 = bot2_class(Board.PLAYER2_PIECE) if game_num % 2 == 0 else bot1_class(Board.PLAYER2_PIECE)
-                    winner, stats = connect4(p1, p2, ui=False, show_board=False)
+                    winner, stats = connect4(p1, p2, ui=False, show_board=False, board_class=board_class,
+                        move_time=args.move_time, increment=args.increment)
 
                     if winner == Board.PLAYER1_PIECE:
                         if game_num % 2 == 0:
@@ -176,7 +181,7 @@ def main(first_player = None, second_player = None):
         print("Can not play game as Human without UI!")
         exit(1)
 
-    connect4(p1, p2, args.ui)
+    connect4(p1, p2, args.ui, board_class=board_class, move_time=args.move_time, increment=args.increment)
 
 def print_match_results(match_matrix, bot_names):
     print("\nMatch Results Matrix:")
@@ -0,0 +1,27 @@
+import random
+import pytest
+from board import Board, BitBoard
+from bots.evaluation import Evaluation
+from bots.evaluation_new import EvaluationNew
+
+
+@pytest.mark.parametrize('board_class', [Board, BitBoard])
+@pytest.mark.parametrize('evaluation_class', [Evaluation, EvaluationNew])
+@pytest.mark.parametrize('piece', [Board.PLAYER1_PIECE, Board.PLAYER2_PIECE])
+def test_tracked_score_matches_full_score(board_class, evaluation_class, piece):
+    rng = random.Random(piece)
+    tracked = evaluation_class(piece)
+    full = evaluation_class(piece)
+    board = board_class(Board.PLAYER1_PIECE)
+    tracked.start_tracking(board)
+
+    for _ in range(400):
+        moves = board.get_valid_locations()
+        if moves and (not board.move_stack or rng.random() < 0.6):
+            board.drop_piece(rng.choice(moves), board.CURR_PLAYER)
+        else:
+            board.undo_move()
+        assert tracked.score_position(board) == full.score_position(board)
+
+    tracked.stop_tracking(board)
+    assert board.listeners == []
@@ -0,0 +1,46 @@
+import random
+from board import Board
+from bots import solver
+from bots.solver import EndgameSolver
+
+
+def random_positions(count, empty, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board(Board.PLAYER1_PIECE)
+        while board.winner is None and board.get_num_slots_filled() < EndgameSolver.CELLS - empty:
+            board.drop_piece(rng.choice(board.get_valid_locations()), board.CURR_PLAYER)
+        if board.winner is None:
+            positions.append(board)
+    return positions
+
+
+def brute_force(board):
+    # plain negamax to the end of the game, scored like EndgameSolver
+    moves = board.get_num_slots_filled()
+    if moves == EndgameSolver.CELLS:
+        return 0
+    best = -EndgameSolver.CELLS
+    for col in board.get_valid_locations():
+        board.drop_piece(col, board.CURR_PLAYER)
+        if board.winner is not None:
+            score = (EndgameSolver.CELLS + 1 - moves) // 2
+        else:
+            score = -brute_force(board)
+        board.undo_move()
+        best = max(best, score)
+    return best
+
+
+def test_mirrored_keys_do_not_change_scores(monkeypatch):
+    positions = random_positions(150, 10, seed=1)
+    mirrored = [EndgameSolver().solve(board)[0] for board in positions]
+    monkeypatch.setattr(solver, 'mirror', lambda bits: bits)
+    plain = [EndgameSolver().solve(board)[0] for board in positions]
+    assert mirrored == plain
+
+
+def test_solver_matches_brute_force():
+    for board in random_positions(20, 8, seed=2):
+        assert EndgameSolver().solve(board)[0] == brute_force(board)